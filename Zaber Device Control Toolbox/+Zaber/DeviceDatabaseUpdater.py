@@ -44,6 +44,11 @@
 # script, you may also need to install the Visual C++ 2015 Redistributable
 # for your system, which is available at: 
 # https://www.microsoft.com/en-us/download/details.aspx?id=48145
+# Downloading a Zstandard-compressed (.zst) database, which decompresses
+# much faster than the default .lzma one, additionally requires Python
+# 3.14 or later or the zstandard package: 'pip install zstandard'.
+# Writing a version 7.3 (HDF5) .mat file with the --matversion option
+# requires the hdf5storage package: 'pip install hdf5storage'.
 #
 # NOTE when downloading the device database, this script identifies itself
 # to Zaber by setting the user-agent HTTP header. This enables Zaber to
@@ -65,19 +70,52 @@
 #              differ only in case from old names.
 #              Added use of User-Agent header to enable measurement of
 #              how often this script is used.
+#  2026-10-15: The downloaded database is now decompressed as it is
+#              received instead of being buffered in memory.
+#              Output generation is skipped if the database is unchanged
+#              since the last run; use --force to override.
+#              Added support for Zstandard-compressed downloads.
+#              Added the --quiet option to suppress progress messages.
+#              Added the --matversion option to write HDF5-based .mat files.
 #}
 
 import argparse
+import collections
+import functools
+import hashlib
+import itertools
+import logging
 import lzma
 import numpy
+import operator
 import os
+import queue
 import re
 import scipy.io
 import sqlite3
 import sys
-import tempfile
+import threading
 import urllib.request
 
+# Zstandard support is optional and is only needed if the database is
+# downloaded in .zst format. It comes from the standard library on Python
+# 3.14 and later, or from the third-party zstandard package.
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# The hdf5storage package is only needed to write version 7.3 .mat files.
+try:
+    import hdf5storage
+except ImportError:
+    hdf5storage = None
+
 # Defaults
 gDownloadUrl = "https://www.zaber.com/software/device-database/devices-public.sqlite.lzma"
 gInputFilename = "devices-public.sqlite"
@@ -101,6 +139,42 @@ sPeripheralSchema = [("PeripheralId", int),
                      ("IsScaleResolutionDependent", bool)
                     ]
 
+# Lower-case dimension names that identify position and force unit scales.
+sPositionDimensions = frozenset(["length", "angle"])
+sForceDimensions = frozenset(["force", "torque"])
+
+# Binary enumerations to generate: key in the get_binary_enum_values()
+# result, MATLAB enum name and MATLAB base type.
+sEnumTypes = [("commands", "BinaryCommandType", "uint8"),
+              ("replies", "BinaryReplyType", "uint8"),
+              ("errors", "BinaryErrorType", "int32")
+             ]
+
+# Matches "    Name (value)" lines in generated binary enum files. Leading
+# and separating whitespace may not span lines.
+sEnumValuePattern = re.compile(r"^[^\S\n]+(\S+)[^\S\n]+\((\d+)\)", re.MULTILINE)
+
+# Characters in database names that are replaced to make MATLAB identifiers.
+sEnumNameTranslation = str.maketrans({ " ": "_", "-": "_" })
+
+# Database queries. These are fixed strings so sqlite can reuse the
+# compiled statements; any values must be bound with ? placeholders
+# rather than formatted into the SQL.
+sMaxDimensionQuery = "SELECT MAX(Id) FROM Matlab_Dimensions;"
+sDimensionsQuery = "SELECT Id, Name FROM Matlab_Dimensions;"
+sUnitConversionsQuery = "SELECT ProductId, DimensionId, Scale, FunctionName FROM Matlab_ProductsDimensionsFunctions;"
+sDeviceTreeQuery = """
+    SELECT d.DeviceId, d.Name, d.Id, p.PeripheralId, p.Name, p.Id
+    FROM Matlab_Devices d
+    LEFT JOIN Matlab_Peripherals p ON p.ParentId = d.Id
+    ORDER BY d.DeviceId, d.MajorVersion DESC, d.MinorVersion DESC, d.Build DESC, d.Id, p.PeripheralId, p.Id;
+"""
+sBinaryCommandsQuery = "SELECT Command, Name FROM Matlab_BinaryCommands;"
+sBinaryReturnSettingsQuery = "SELECT ReturnCommand, Name FROM Matlab_BinarySettings WHERE ReturnCommand NOT NULL;"
+sBinarySetSettingsQuery = "SELECT SetCommand, Name FROM Matlab_BinarySettings WHERE SetCommand NOT NULL;"
+sBinaryRepliesQuery = "SELECT Reply, Name FROM Matlab_BinaryReplies;"
+sBinaryErrorsQuery = "SELECT Code, Name FROM Matlab_BinaryErrors;"
+
 
 def create_command_line_parser():
     """
@@ -116,15 +190,67 @@ def create_command_line_parser():
     parser.add_argument("--url", dest = "url", type = str, default = gDownloadUrl, help = "Optional: Specify an alternate URL to download the database from.")
     parser.add_argument("--dbfile", type = str, default = gInputFilename, help = "Optional: Override the default name of the sqlite database file to download to and read from (" + gInputFilename + ").")
     parser.add_argument("--matfile", type = str, default = gOutputFilename, help = "Override the name of the MATLAB .mat device database (" + gOutputFilename + ").")
+    parser.add_argument("--codec", type = str, choices = ["auto", "lzma", "zstd"], default = "auto", help = "Optional: Compression format of the downloaded file. Default is to detect it from the URL and server response, falling back to lzma.")
+    parser.add_argument("--matversion", type = str, choices = ["5", "7.3"], default = "5", help = "Optional: MATLAB file format of the .mat device database. Version 7.3 is HDF5-based, uses less memory to write and needs the hdf5storage package. Default is 5.")
     parser.add_argument("--download", action = "store_true", help = "Optional: Force re-download of database file even if already present. Default is to use the existing file if present, or download it otherwise.")
     parser.add_argument("--nodelete", action = "store_true", help = "Optional: Keep the downloaded database file(s) after processing is complete. Defaults to false.")
     parser.add_argument("--skipdevices", action = "store_true", help = "Optional: Do not update the device database .mat file. Default is to update the file.")
     parser.add_argument("--skipenums", action = "store_true", help = "Optional: Do not update the binary code enumerations. Default is to update them.")
+    parser.add_argument("--quiet", action = "store_true", help = "Optional: Only print warnings and errors, not progress messages. Useful for automated runs.")
+    parser.add_argument("--force", action = "store_true", help = "Optional: Regenerate the output files even if the database has not changed since they were last generated.")
 
     return parser
 
 
-def download_device_database(aUrl, aPath):
+def get_download_codec(aUrl, aContentType):
+    """
+    Guess the compression format of a download.
+
+    Parameters
+    ----------
+    aUrl: str
+        URL the file was downloaded from.
+    aContentType: str
+        Value of the Content-Type header of the response.
+
+    Returns
+    -------
+    str - "zstd" if the file appears to be Zstandard-compressed, or "lzma"
+          otherwise.
+    """
+    if (aUrl.lower().endswith(".zst") or ("zstd" in aContentType.lower())):
+        return "zstd"
+
+    return "lzma"
+
+
+def create_decompressor(aCodec):
+    """
+    Create an incremental decompressor for the given compression format.
+
+    Parameters
+    ----------
+    aCodec: str
+        "lzma" or "zstd".
+
+    Returns
+    -------
+    Decompressor object with a decompress(bytes) method and an eof flag.
+    """
+    if (aCodec == "lzma"):
+        return lzma.LZMADecompressor()
+    elif (aCodec == "zstd"):
+        if (zstd is not None):
+            return zstd.ZstdDecompressor()
+        elif (zstandard is not None):
+            return zstandard.ZstdDecompressor().decompressobj()
+        else:
+            raise ImportError("Zstandard decompression requires Python 3.14 or later or the zstandard package: 'pip install zstandard'.")
+
+    raise ValueError("Unknown compression format " + aCodec)
+
+
+def download_device_database(aUrl, aPath, aCodec = "auto"):
     """
     Download a database, decompress it and save to the specified filename.
 
@@ -133,30 +259,121 @@ def download_device_database(aUrl, aPath):
     aUrl: str
         URL to download the database file from.
     aPath: str
-        Location to store the downloaded and decompressed file.
+        Location to store the downloaded and decompressed file. This is
+        only replaced once the whole download has been decompressed
+        successfully.
+    aCodec: str
+        Compression format of the download: "lzma", "zstd" or "auto" to
+        detect it from the URL and response headers.
     """
     headers = { "User-Agent": "ZaberDeviceControlToolbox/1.2.0 (Python)" }
     request = urllib.request.Request(aUrl, None, headers)
-    
-    with tempfile.TemporaryFile() as tmpFile:
+
+    # Decompress the download as it arrives, so that neither the compressed
+    # nor the decompressed database is ever held in memory in full. The
+    # decompression runs on a worker thread fed through a small queue, so
+    # it overlaps with the network transfer; both decompressors release
+    # the GIL while working.
+    # The data is written to a temporary file next to aPath, which only
+    # replaces aPath once decompression has succeeded, so a failed
+    # download never leaves a partial database behind.
+    blockSize = 1 << 20
+    partialPath = aPath + ".part"
+    chunks = queue.Queue(maxsize = 4)
+    errors = []
+    failed = threading.Event()
+
+    def decompress(aDecompressor):
+        chunk = b""
+        try:
+            with open(partialPath, "wb", buffering = blockSize) as ofp:
+                while True:
+                    chunk = chunks.get()
+                    if chunk is None:
+                        break
+                    ofp.write(aDecompressor.decompress(chunk))
+
+            if not aDecompressor.eof:
+                raise EOFError("Compressed data ended before the end-of-stream marker.")
+        except Exception as e:
+            errors.append(e)
+            # Tell the download thread to stop reading, and keep consuming
+            # until the end marker so it cannot block on a full queue.
+            failed.set()
+            while chunk is not None:
+                chunk = chunks.get()
+
+    try:
         with urllib.request.urlopen(request) as response:
-            data = response.read()
-            tmpFile.write(data)
-            
-        tmpFile.seek(0)
+            codec = aCodec
+            if (codec == "auto"):
+                codec = get_download_codec(aUrl, response.headers.get("Content-Type", ""))
+
+            decompressor = create_decompressor(codec)
+            logging.info("Downloading and decompressing (%s)...", codec)
+            worker = threading.Thread(target = decompress, args = (decompressor,))
+            worker.start()
+            try:
+                while not failed.is_set():
+                    chunk = response.read(1 << 16)
+                    if not chunk:
+                        break
+                    chunks.put(chunk)
+            finally:
+                chunks.put(None)
+                worker.join()
+
+        if errors:
+            raise IOError("Failed to decompress downloaded device database.") from errors[0]
+
+        os.replace(partialPath, aPath)
+    finally:
+        if os.path.exists(partialPath):
+            os.remove(partialPath)
+
+
+def get_file_hash(aPath):
+    """
+    Compute a hash of a file's content without loading it all at once.
+
+    Parameters
+    ----------
+    aPath: str
+        Path to the file to hash.
+
+    Returns
+    -------
+    str - Hexadecimal BLAKE2 digest of the file content.
+    """
+    digest = hashlib.blake2b(digest_size = 16)
+    with open(aPath, "rb") as fp:
+        while True:
+            chunk = fp.read(1 << 20)
+            if not chunk:
+                break
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
 
-        print("Decompressing downloaded file...")
-        with lzma.open(tmpFile) as ifp:
-            data = ifp.read()
+def read_generation_stamp(aPath):
+    """
+    Read the database hash and output options recorded by a previous run.
 
-    if len(data) < 1:
-        raise IOError("Failed to decompress downloaded device database.")
+    Parameters
+    ----------
+    aPath: str
+        Path to the hash file.
 
-    if os.path.exists(aPath):
-        os.remove(aPath)
+    Returns
+    -------
+    str - The recorded stamp, or None if there is no hash file.
+    """
+    if (not os.path.isfile(aPath)):
+        return None
 
-    with open(aPath, "wb") as ofp:
-        ofp.write(data)
+    with open(aPath, "rt") as fp:
+        return fp.read().strip()
 
 
 def get_dimension_names(aCursor):
@@ -170,38 +387,81 @@ def get_dimension_names(aCursor):
 
     Returns
     -------
-    str[]: Names of the unit of measure dimensions.
-    """
-    aCursor.execute("SELECT * FROM Matlab_Dimensions;")
-    dimensions = { 0: "none" }
-    maxIndex = 0
-    for row in aCursor.fetchall():
-        id = int(row["Id"])
-        name = str(row["Name"])
-        dimensions[id] = name
-        if (id > maxIndex):
-            maxIndex = id;
-
-    result = []
-    result.extend(["unknown"] * (maxIndex + 1))
-    for (key, value) in iter(dimensions.items()):
-        result[key] = value
+    str[]: Names of the unit of measure dimensions, in lower case.
+    """
+    aCursor.execute(sMaxDimensionQuery)
+    (maxIndex,) = aCursor.fetchone()
+    result = ["unknown"] * (max(int(maxIndex or 0), 0) + 1)
+    result[0] = "none"
+
+    aCursor.execute(sDimensionsQuery)
+    for (id, name) in aCursor:
+        result[int(id)] = str(name).lower()
 
     return result
 
 
-def get_device_unit_conversions(aCursor, aDimensionTable, aProductId):
+def get_unit_conversion_rows(aCursor):
     """
-    Determine the physical units of the device.
+    Load the unit conversion table, grouped by product.
+
+    The rows of each product keep the order in which the table is
+    scanned, because later rows override earlier ones in
+    get_device_unit_conversions(). This does not rely on rowid, which
+    is not available if the table is a view.
 
     Parameters
     ----------
     aCursor: sqlite3 cursor
         Open cursor in the device database.
+
+    Returns
+    -------
+    dict - Maps device or peripheral product IDs (ints) to lists of
+           (dimension ID, scale, function name) tuples for that product.
+    """
+    aCursor.execute(sUnitConversionsQuery)
+    result = collections.defaultdict(list)
+    for (productId, dimensionId, scale, functionName) in aCursor:
+        result[int(productId)].append((dimensionId, scale, functionName))
+
+    return result
+
+
+@functools.lru_cache(maxsize = None)
+def classify_unit_function(aFunctionName):
+    """
+    Determine the properties of a unit conversion function from its name.
+    There are only a handful of distinct function names in the database,
+    so results are cached.
+
+    Parameters
+    ----------
+    aFunctionName: str
+        Unit conversion function name from the database.
+
+    Returns
+    -------
+    3-tuple of bool:
+        [0]: True if the function is a linear conversion.
+        [1]: True if the function is a tangential conversion.
+        [2]: True if the function takes resolution into account.
+    """
+    function = aFunctionName.lower()
+    return ("linear" in function, "tangential" in function, "resolution" in function)
+
+
+def get_device_unit_conversions(aUnitRows, aDimensionTable):
+    """
+    Determine the physical units of the device.
+
+    Parameters
+    ----------
+    aUnitRows: Array
+        (dimension ID, scale, function name) tuples from the unit
+        conversion table for one device or peripheral.
     aDimensionTable: str[]
         Return value from get_dimension_names().
-    aProductId: int or str
-        Device or peripheral product ID to get units for.
 
     Returns
     -------
@@ -223,28 +483,24 @@ def get_device_unit_conversions(aCursor, aDimensionTable, aProductId):
     velocityScale = 1.0
     accelScale = 1.0
     forceScale = 1.0
-    function = "linear-resolution"
     useResolution = False
 
-    aCursor.execute("SELECT * FROM Matlab_ProductsDimensionsFunctions WHERE ProductId = " + str(aProductId) + ";")
-    rows = aCursor.fetchall()
-    for row in rows:
-        dimensionId = int(row["DimensionId"])
-        scale = float(row["Scale"])
-        function = str(row["FunctionName"]).lower()
-        dimensionName = aDimensionTable[dimensionId].lower()
-        if (dimensionName in ["length", "angle"]):
+    for (dimensionId, scale, function) in aUnitRows:
+        scale = float(scale)
+        dimensionName = aDimensionTable[int(dimensionId)]
+        if (dimensionName in sPositionDimensions):
             positionScale = scale
 
             # Every device is expected to have a position function, so only
             # check the motion type once to avoid getting confused by unit
             # conversions for current, percent etc.
 
-            if ("resolution" in function):
+            (isLinear, isTangential, hasResolution) = classify_unit_function(str(function))
+            if (hasResolution):
                 useResolution = True
 
             # These values have to match the MATLAB Zaber.MotionType enum.
-            if ("linear" in function):
+            if (isLinear):
                 if ("length" == dimensionName) or ("velocity" == dimensionName) or ("acceleration" == dimensionName):
                     motionType = 1 # Linear
                 elif ("ang" in dimensionName):
@@ -253,16 +509,16 @@ def get_device_unit_conversions(aCursor, aDimensionTable, aProductId):
                     motionType = 0 # None
                 else:
                     motionType = 9 # Unknown
-            elif ("tangential" in function):
+            elif (isTangential):
                 motionType = 3 # Tangential
             else:
-                raise KeyError("Unrecognized position unit conversion function " + function)
+                raise KeyError("Unrecognized position unit conversion function " + str(function).lower())
 
         elif ("velocity" in dimensionName):
             velocityScale = scale
         elif ("acceleration" in dimensionName):
             accelScale = scale
-        elif (dimensionName in ["force", "torque"]):
+        elif (dimensionName in sForceDimensions):
             forceScale = scale
 
     return (motionType, positionScale, velocityScale, accelScale, forceScale, useResolution)
@@ -285,81 +541,92 @@ def read_device_info(aCursor):
     """
 
     dimensions = get_dimension_names(aCursor);
+    units = get_unit_conversion_rows(aCursor)
+
+    # One query returns every device with its peripherals, one row per
+    # peripheral (or a single row with no peripheral for devices that are
+    # not controllers), sorted so that each device and firmware version
+    # is contiguous.
+    aCursor.execute(sDeviceTreeQuery)
+
+    deviceRecords = []
+    # (device ID, name, [(peripheral ID, peripheral name)]) for logging.
+    deviceSummaries = []
+    for (dId, deviceRows) in itertools.groupby(aCursor, key = operator.itemgetter(0)):
+        # Only take information from the highest firmware version, which sorts first.
+        # The MATLAB toolbox currently does not consider firmware version part of the device identity.
+        (_, firmwareRows) = next(itertools.groupby(deviceRows, key = operator.itemgetter(2)))
+
+        # Records are built as plain tuples in sPeripheralSchema field
+        # order and converted to a recarray in one step, which is much
+        # faster than assigning recarray fields one at a time.
+        peripheralRecords = []
+        peripheralNames = []
+        for (_, name, devicePk, peripheralId, peripheralName, peripheralPk) in firmwareRows:
+            name = str(name)
+            if (peripheralPk is None): # Not a controller.
+                unit = get_device_unit_conversions(units.get(int(devicePk), []), dimensions)
+                peripheralRecords.append((0, "") + unit[1:5] + (unit[0], unit[5]))
+            else:
+                peripheralId = int(peripheralId)
+                peripheralName = str(peripheralName)
+                unit = get_device_unit_conversions(units.get(int(peripheralPk), []), dimensions)
+                peripheralNames.append((peripheralId, peripheralName))
+                peripheralRecords.append((peripheralId, peripheralName) + unit[1:5] + (unit[0], unit[5]))
 
-    # Get all device IDs and choose only the latest firmware version for each.
-    devices = []
+        deviceSummaries.append((int(dId), name, peripheralNames))
 
-    aCursor.execute("SELECT * FROM Matlab_Devices ORDER BY DeviceId, MajorVersion DESC, MinorVersion DESC, Build DESC;")
-    rows = aCursor.fetchall()
+        periTable = numpy.rec.fromrecords(peripheralRecords, dtype=sPeripheralSchema)
+        deviceRecords.append((int(dId), name, periTable))
 
-    if (len(rows) < 1):
+    numDevices = len(deviceRecords)
+    if (numDevices < 1):
         raise IOError("No devices found in this database!")
 
-    currentId = -1
-    for row in rows:
-        dId = int(row["DeviceId"])
-        if (dId != currentId):
-            # Only take information from the highest firmware version.
-            # The MATLAB toolbox currently does not consider firmware version part of the device identity.
-            currentId = dId; 
-            # First column is the device ID, second is the device name, third is the primary key.
-            devices.append((dId, str(row["Name"]), int(row["Id"])))
-
-    numDevices = len(devices)
-    print("Found " + str(numDevices) + " unique device IDs.")
-    table = numpy.recarray((numDevices,), dtype=sDeviceSchema)
-
-    for i in range(0, numDevices):
-        device = devices[i]
-        table[i].DeviceId = device[0]
-        table[i].Name = device[1]
-        msg = str(device[0]) + " = " + device[1]
-
-        peripherals = []
-        
-        aCursor.execute("SELECT * FROM Matlab_Peripherals WHERE ParentId = " + str(device[2]) + " ORDER BY PeripheralId;")
-        rows = aCursor.fetchall()
-        for row in rows:
-            # First column is the peripheral ID, second is the peripheral name, third is the primary key.
-            peripherals.append((int(row["PeripheralId"]), str(row["Name"]), int(row["Id"])))
-
-        numPeripherals = len(peripherals)
-        if (numPeripherals < 1): # Not a controller.
-            periTable = numpy.recarray((1,), dtype=sPeripheralSchema)
-            periTable[0].PeripheralId = 0
-            periTable[0].Name = ""
-            
-            unit = get_device_unit_conversions(aCursor, dimensions, device[2])
-            periTable[0].MotionType = unit[0]
-            periTable[0].PositionUnitScale = unit[1]
-            periTable[0].VelocityUnitScale = unit[2]
-            periTable[0].AccelerationUnitScale = unit[3]
-            periTable[0].ForceUnitScale = unit[4]
-            periTable[0].IsScaleResolutionDependent = unit[5]
-        else:
-            msg += " + " + str(numPeripherals) + " peripherals:"
-            periTable = numpy.recarray((numPeripherals,), dtype=sPeripheralSchema)
-            for j in range(0, numPeripherals):
-                peripheral = peripherals[j]
-                periTable[j].PeripheralId = peripheral[0]
-                periTable[j].Name = peripheral[1]
-                msg += "\n- " + str(periTable[j].PeripheralId) + " = " + str(periTable[j].Name)
-            
-                unit = get_device_unit_conversions(aCursor, dimensions, peripheral[2])
-                periTable[j].MotionType = unit[0]
-                periTable[j].PositionUnitScale = unit[1]
-                periTable[j].VelocityUnitScale = unit[2]
-                periTable[j].AccelerationUnitScale = unit[3]
-                periTable[j].ForceUnitScale = unit[4]
-                periTable[j].IsScaleResolutionDependent = unit[5]
-
-        table[i].Peripherals = periTable
-
-        print(msg)
+    logging.info("Found %d unique device IDs.", numDevices)
+
+    # Per-device messages are only formatted if they will be shown.
+    if (logging.getLogger().isEnabledFor(logging.INFO)):
+        for (dId, name, peripheralNames) in deviceSummaries:
+            if (len(peripheralNames) < 1):
+                logging.info("%d = %s", dId, name)
+            else:
+                lines = ["%d = %s + %d peripherals:" % (dId, name, len(peripheralNames))]
+                lines.extend(["- %d = %s" % peripheral for peripheral in peripheralNames])
+                logging.info("\n".join(lines))
+
+    table = numpy.rec.fromrecords(deviceRecords, dtype=sDeviceSchema)
 
     return table
 
 
+def save_device_table(aTable, aPath, aVersion):
+    """
+    Save the device table to a MATLAB .mat file.
+
+    Parameters
+    ----------
+    aTable: numpy.recarray
+        Return value from read_device_info().
+    aPath: str
+        Name of the .mat file to write.
+    aVersion: str
+        MATLAB file format version: "5" for the classic format, or "7.3"
+        for the HDF5-based format, which is written to disk incrementally
+        and needs the hdf5storage package.
+    """
+    if (aVersion == "7.3"):
+        if (hdf5storage is None):
+            raise ImportError("Writing version 7.3 .mat files requires the hdf5storage package: 'pip install hdf5storage'.")
+
+        # Truncate any existing file; by default hdf5storage appends to it,
+        # which fails on a version 5 file and keeps stale variables in a
+        # version 7.3 one.
+        hdf5storage.savemat(aPath, { "devices" : aTable }, format = "7.3", store_python_metadata = False, truncate_existing = True)
+    else:
+        scipy.io.savemat(aPath, { "devices" : aTable })
+
+
 def get_binary_enum_values(aCursor):
     """
     Find binary command names and values.
@@ -383,39 +650,34 @@ def get_binary_enum_values(aCursor):
     result = {}
 
     commands = []
-    aCursor.execute("SELECT * FROM Matlab_BinaryCommands;")
-    rows = aCursor.fetchall()
-    for row in rows:
-        commands.append((row["Command"], row["Name"]))
-
-    aCursor.execute("SELECT * FROM Matlab_BinarySettings WHERE ReturnCommand NOT NULL;")
-    rows = aCursor.fetchall()
-    for row in rows:
-        commands.append((row["ReturnCommand"], "Return " + row["Name"]))
-
-    aCursor.execute("SELECT * FROM Matlab_BinarySettings WHERE SetCommand NOT NULL;")
-    rows = aCursor.fetchall()
-    for row in rows:
-        commands.append((row["SetCommand"], "Set " + row["Name"]))
-
-    result["commands"] = sorted(commands, key=lambda item: item[1])
+    aCursor.execute(sBinaryCommandsQuery)
+    for (code, name) in aCursor:
+        commands.append((code, name))
+
+    aCursor.execute(sBinaryReturnSettingsQuery)
+    for (code, name) in aCursor:
+        commands.append((code, "Return " + name))
+
+    aCursor.execute(sBinarySetSettingsQuery)
+    for (code, name) in aCursor:
+        commands.append((code, "Set " + name))
+
+    result["commands"] = sorted(commands, key = operator.itemgetter(1))
     
     replies = []
-    aCursor.execute("SELECT * FROM Matlab_BinaryReplies;")
-    rows = aCursor.fetchall()
-    for row in rows:
-        replies.append((row["Reply"], row["Name"]))
+    aCursor.execute(sBinaryRepliesQuery)
+    for (code, name) in aCursor:
+        replies.append((code, name))
 
-    result["replies"] = sorted(replies, key=lambda item: item[1])
+    result["replies"] = sorted(replies, key = operator.itemgetter(1))
 
     errors = []
 
-    aCursor.execute("SELECT * FROM Matlab_BinaryErrors;")
-    rows = aCursor.fetchall()
-    for row in rows:
-        errors.append((row["Code"], row["Name"]))
+    aCursor.execute(sBinaryErrorsQuery)
+    for (code, name) in aCursor:
+        errors.append((code, name))
 
-    result["errors"] = sorted(errors, key=lambda item: item[1])
+    result["errors"] = sorted(errors, key = operator.itemgetter(1))
 
     return result
 
@@ -431,26 +693,17 @@ def read_binary_enum_file(aPath):
     aPath: str
         Path to the file to read in.
 
-    Returns
+    Yields
     ----------
-    Array - 2-tuples read from the file. First element is the name of the
-            enum value and the second element is the value as an int.
-            Note there may be multiple instances of the same number.
+    2-tuples read from the file. First element is the name of the enum
+    value and the second element is the value as an int. Note there may
+    be multiple instances of the same number.
     """
-    result = []
-
-    r = re.compile("^\s+([^\s]+)\s+\((\d+)\)")
     with open(aPath, "rt") as fp:
-        for line in fp.readlines():
-            match = r.match(line)
-            if match:
-                groups = match.groups()
-                if (len(groups) == 2):
-                    name = groups[0]
-                    val = int(groups[1])
-                    result.append((name, val))
+        content = fp.read()
 
-    return result
+    for match in sEnumValuePattern.finditer(content):
+        yield (match.group(1), int(match.group(2)))
 
 
 def write_binary_enum_file(aCodeTable, aEnumName, aBaseType):
@@ -477,70 +730,62 @@ def write_binary_enum_file(aCodeTable, aEnumName, aBaseType):
         Name of the base data type for the enum, ie "uint8".
     """
 
-    valuesbyName = dict()
-    namesByValue = dict()
+    valuesByName = dict()
+    # Lower-cased names already assigned to each numeric value, for
+    # case-insensitive matching of new names against old ones.
+    lowerNamesByValue = collections.defaultdict(set)
+    maxLength = 1
 
     filename = aEnumName + ".m"
-    print("Generating " + filename + "...")
+    logging.info("Generating %s...", filename)
     if (os.path.exists(filename)):
         valuesByName = dict(read_binary_enum_file(filename))
         for (name, code) in valuesByName.items():
-            namesByValue.setdefault(code, [])
-            namesByValue[code].append(name)
+            lowerNamesByValue[code].add(name.lower())
+            maxLength = max(maxLength, len(name))
 
         os.remove(filename)
 
     # Merge old names with new names.
     for (code, rawName) in aCodeTable:
-        name = rawName.replace(" ", "_").replace("-", "_")
-        if code not in namesByValue:
+        name = rawName.translate(sEnumNameTranslation)
+        if code not in lowerNamesByValue:
             # New enum value case.
-            namesByValue.setdefault(code, [])
-            namesByValue[code].append(name)
+            lowerNamesByValue[code].add(name.lower())
             # Print a warning if the name already existed.
             if name in valuesByName:
-                print("WARNING: Value of '%s' has changed!" % name)
+                logging.warning("WARNING: Value of '%s' has changed!", name)
             valuesByName[name] = code
+            maxLength = max(maxLength, len(name))
         else:
             # Numeric value previously existed - use old name if the new 
             # name is the case-insensitively the same. Else duplicate it.
-            oldNameMatches = False
-            for oldName in namesByValue[code]:
-                if (oldName.lower() == name.lower()):
-                    oldNameMatches = True
-                    break
-
-            if (not oldNameMatches):
-                namesByValue[code].append(name)
+            lowerName = name.lower()
+            if (lowerName not in lowerNamesByValue[code]):
+                lowerNamesByValue[code].add(lowerName)
                 if ((name in valuesByName) and (code != valuesByName[name])):
-                    print("WARNING: Value of '%s' has changed!" % name)
+                    logging.warning("WARNING: Value of '%s' has changed!", name)
                 valuesByName[name] = code
+                maxLength = max(maxLength, len(name))
 
-    maxLength = 1
-    for name in valuesByName.keys():
-        maxLength = max(maxLength, len(name))
-
-    generatedNames = set()
-    with open(filename, "wt") as fp:
-        fp.write("%%   %s Enumeration to assist with interpreting Zaber Binary protocol codes.\n\n" % (aEnumName.upper()))
-        fp.write("%   THIS IS A GENERATED FILE - DO NOT EDIT. See DeviceDatabaseUpdater.py.\n\n")
-        fp.write("classdef %s < %s\n" % (aEnumName, aBaseType))
-        fp.write("    enumeration\n")
-
-        first = True
-        sortedNames = sorted(valuesByName.keys())
-        for name in sortedNames:
-            code = valuesByName[name]
-            if name not in generatedNames:
-                generatedNames.add(name)
-                if not first:
-                    fp.write(",\n")
-                first = False
-                fp.write("        %s (%d)" % (name.ljust(maxLength, " "), code))
-        fp.write("\n")
-
-        fp.write("    end\n")
-        fp.write("end\n")
+    # Build the whole file in memory and write it in one call.
+    entries = []
+    for name in sorted(valuesByName.keys()):
+        entries.append("        %s (%d)" % (name.ljust(maxLength, " "), valuesByName[name]))
+
+    parts = [
+        "%%   %s Enumeration to assist with interpreting Zaber Binary protocol codes.\n\n" % (aEnumName.upper()),
+        "%   THIS IS A GENERATED FILE - DO NOT EDIT. See DeviceDatabaseUpdater.py.\n\n",
+        "classdef %s < %s\n" % (aEnumName, aBaseType),
+        "    enumeration\n",
+        ",\n".join(entries),
+        "\n",
+        "    end\n",
+        "end\n"
+    ]
+
+    with open(filename, "wt", buffering = 1 << 16) as fp:
+        fp.write("".join(parts))
 
 
 def run(aArgs):
@@ -557,6 +802,9 @@ def run(aArgs):
     gInputFilename = args.dbfile
     gOutputFilename = args.matfile
 
+    logging.basicConfig(format = "%(message)s", stream = sys.stdout,
+                        level = logging.WARNING if args.quiet else logging.INFO)
+
     doDownload = args.download
     doDelete = not args.nodelete
     doOutputMatrix = not args.skipdevices
@@ -564,40 +812,76 @@ def run(aArgs):
 
     if os.path.isfile(gInputFilename):
         if (not doDownload):
-            print("Database file already exists; will not delete it.")
+            logging.info("Database file already exists; will not delete it.")
             doDelete = False
     else:
-        print("Database download forced because file " + gInputFilename + " does not exist.")
+        logging.info("Database download forced because file %s does not exist.", gInputFilename)
         doDownload = True
 
     if doDownload:
-        print("Downloading device database from: " + gDownloadUrl)
-        download_device_database(gDownloadUrl, gInputFilename)
-
-    print("Reading database " + gInputFilename + " (might take a while)...")
-    connection = sqlite3.connect(gInputFilename)
-    connection.row_factory = sqlite3.Row
-    cursor = connection.cursor()
-
-    # Save the database to the .mat file.
+        logging.info("Downloading device database from: %s", gDownloadUrl)
+        download_device_database(gDownloadUrl, gInputFilename, args.codec)
+
+    # Skip regeneration if the outputs were produced from an identical
+    # database file with the same output options and into the same
+    # output locations last time. The enum files are always written to
+    # the current directory.
+    hashFilename = gInputFilename + ".hash"
+    stamp = "\n".join([get_file_hash(gInputFilename),
+                       "matversion=" + args.matversion,
+                       "matfile=" + os.path.abspath(gOutputFilename),
+                       "enumdir=" + os.path.abspath(os.curdir)])
+    outputFilenames = []
     if (doOutputMatrix):
-
-        table = read_device_info(cursor)
-        print("Saving device database data to " + gOutputFilename)
-        scipy.io.savemat(gOutputFilename, { "devices" : table })
-
-    # Generate the binary command list.
+        outputFilenames.append(gOutputFilename)
     if (doOutputEnums):
-        enums = get_binary_enum_values(cursor)
-        write_binary_enum_file(enums["commands"], "BinaryCommandType", "uint8");
-        write_binary_enum_file(enums["replies"], "BinaryReplyType", "uint8");
-        write_binary_enum_file(enums["errors"], "BinaryErrorType", "int32");
-
-    connection.close()
+        outputFilenames.extend([enumName + ".m" for (_, enumName, _) in sEnumTypes])
+
+    if ((not args.force) and (read_generation_stamp(hashFilename) == stamp)
+        and all(os.path.exists(f) for f in outputFilenames)):
+        logging.info("Generated files are up to date with %s; use --force to regenerate them.", gInputFilename)
+        doOutputMatrix = False
+        doOutputEnums = False
+
+    if (doOutputMatrix or doOutputEnums):
+        # Invalidate the old stamp before touching any output, so that an
+        # interrupted or partial run is never mistaken for a complete one.
+        if (os.path.exists(hashFilename)):
+            os.remove(hashFilename)
+
+        logging.info("Reading database %s (might take a while)...", gInputFilename)
+        connection = sqlite3.connect(gInputFilename)
+
+        # The database is only read, so tune sqlite for that: no writes,
+        # memory-mapped reads, a 64 MiB page cache and in-memory temporary
+        # storage for the sorts.
+        connection.executescript("PRAGMA query_only = 1; PRAGMA mmap_size = 268435456; PRAGMA cache_size = -65536; PRAGMA temp_store = MEMORY;")
+        cursor = connection.cursor()
+
+        # Save the database to the .mat file.
+        if (doOutputMatrix):
+
+            table = read_device_info(cursor)
+            logging.info("Saving device database data to %s", gOutputFilename)
+            save_device_table(table, gOutputFilename, args.matversion)
+
+        # Generate the binary command list.
+        if (doOutputEnums):
+            enums = get_binary_enum_values(cursor)
+            for (key, enumName, baseType) in sEnumTypes:
+                write_binary_enum_file(enums[key], enumName, baseType)
+
+        connection.close()
+
+        # Only record the stamp when everything was regenerated, so that a
+        # partial run does not mask outputs that are out of date.
+        if (doOutputMatrix and doOutputEnums):
+            with open(hashFilename, "wt") as fp:
+                fp.write(stamp + "\n")
 
     # Optionally delete the downloaded file.
     if doDelete:
-        print("Removing downloaded file " + gInputFilename)
+        logging.info("Removing downloaded file %s", gInputFilename)
         os.remove(gInputFilename)
 
 